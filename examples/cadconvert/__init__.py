@@ -0,0 +1,46 @@
+import importlib
+
+from .formats import INPUT_FORMATS, OUTPUT_OPTIONS
+
+# The engine imports aspose.cad, which starts the .NET runtime; it is only
+# imported once one of its names is used, so probe and dxf stay pure Python.
+# probe is lazy too, so "python -m cadconvert.probe" finds the submodule unimported.
+_LAZY = {
+    "RenderCache": "cache",
+    "convert": "engine",
+    "load": "engine",
+    "output_options": "engine",
+    "preview": "engine",
+    "probe": "probe",
+    "rasterization_options": "engine",
+    "resolve_target": "engine",
+    "save": "engine",
+    "save_many": "engine",
+}
+
+__all__ = [
+    "INPUT_FORMATS",
+    "OUTPUT_OPTIONS",
+    "RenderCache",
+    "convert",
+    "load",
+    "output_options",
+    "preview",
+    "probe",
+    "rasterization_options",
+    "resolve_target",
+    "save",
+    "save_many",
+]
+
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    value = getattr(importlib.import_module("." + _LAZY[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,70 @@
+import argparse
+import sys
+import time
+
+from .batch import expand_inputs, plan, run_batch, run_sequential, summarize
+from .cache import RenderCache
+from .formats import OUTPUT_OPTIONS, normalize
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="cadconvert", description="Convert CAD drawings with Aspose.CAD.")
+    parser.add_argument("inputs", nargs="+", help="drawings, directories or glob patterns to convert")
+    parser.add_argument("-t", "--to", dest="formats", action="append", required=True,
+                        help="output format, may be repeated (%s)" % ", ".join(sorted(OUTPUT_OPTIONS)))
+    parser.add_argument("-o", "--output-dir", default=".", help="directory for the results")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="worker processes; 0 uses one per CPU (default: convert in this process)")
+    parser.add_argument("--timeout", type=float, help="seconds allowed per file; implies a worker pool")
+    parser.add_argument("--cache", metavar="DIR", help="reuse results stored in this render cache directory")
+    parser.add_argument("--cache-size", type=float, default=1024, metavar="MB", help="render cache size limit")
+    parser.add_argument("--page-width", type=float)
+    parser.add_argument("--page-height", type=float)
+    parser.add_argument("--zoom", type=float)
+    parser.add_argument("--layer", dest="layers", action="append", help="layer to render, may be repeated")
+    parser.add_argument("--background", help="background color name, e.g. white")
+    parser.add_argument("--quality", choices=("low", "medium", "high"),
+                        help="text, hatch and arc quality; low is meant for previews")
+    return parser.parse_args(argv)
+
+
+def raster_kwargs(args):
+    return {
+        "page_width": args.page_width,
+        "page_height": args.page_height,
+        "zoom": args.zoom,
+        "layers": args.layers,
+        "background_color": args.background,
+        "quality": args.quality,
+    }
+
+
+def report(result):
+    if result["status"] == "ok":
+        print("%s: %.2fs" % (result["src"], result["seconds"]))
+    else:
+        print("%s: %s: %s" % (result["src"], result["status"], result["error"]), file=sys.stderr)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    formats = [normalize(fmt) for fmt in args.formats]
+    try:
+        jobs = plan(expand_inputs(args.inputs), formats, args.output_dir)
+    except ValueError as e:
+        print("cadconvert: %s" % e, file=sys.stderr)
+        return 2
+    cache = RenderCache(args.cache, int(args.cache_size * 1024 * 1024)) if args.cache else None
+    begin = time.perf_counter()
+    if args.jobs == 1 and args.timeout is None:
+        results = run_sequential(jobs, raster_kwargs(args), report, cache)
+    else:
+        results = run_batch(jobs, args.jobs or None, args.timeout, raster_kwargs(args), report, cache)
+    summary = summarize(results, time.perf_counter() - begin)
+    print("%(files)d files (%(ok)d ok, %(errors)d errors, %(timeouts)d timeouts) in %(seconds).1fs: "
+          "%(files_per_second).2f files/s, %(megabytes_per_second).2f MB/s" % summary)
+    return 0 if summary["ok"] == summary["files"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
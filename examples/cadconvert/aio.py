@@ -0,0 +1,145 @@
+import asyncio
+import concurrent.futures
+import inspect
+import os
+import threading
+
+from . import engine
+
+MAX_WORKERS = min(4, os.cpu_count() or 1)
+CHUNK_SIZE = 1024 * 1024
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = concurrent.futures.ThreadPoolExecutor(MAX_WORKERS, thread_name_prefix="cadconvert")
+        return _executor
+
+
+def _dispose(future):
+    if not future.cancelled() and future.exception() is None:
+        with future.result():
+            pass
+
+
+def _closing(*buffers):
+    def close(future):
+        for buffer in buffers:
+            buffer.close()
+    return close
+
+
+async def _run(func, *args, discard=None):
+    """Run ``func`` on the shared executor.
+
+    Cancelling the caller drops a call that has not started yet. A call
+    already running cannot be interrupted. Whenever the call fails or
+    the caller is cancelled, ``discard`` is called with its future once
+    the call has finished, to release what the call was using or made.
+    """
+    future = _get_executor().submit(func, *args)
+    try:
+        return await asyncio.wrap_future(future)
+    except BaseException:
+        future.cancel()
+        if discard is not None:
+            future.add_done_callback(discard)
+        raise
+
+
+def _is_async_reader(src):
+    return hasattr(src, "__aiter__") or inspect.iscoroutinefunction(getattr(src, "read", None))
+
+
+def _is_async_writer(dst):
+    return hasattr(dst, "drain") or inspect.iscoroutinefunction(getattr(dst, "write", None))
+
+
+async def _read_into(src, buffer):
+    if inspect.iscoroutinefunction(getattr(src, "read", None)):
+        while True:
+            chunk = await src.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            buffer.write(chunk)
+    else:
+        async for chunk in src:
+            buffer.write(chunk)
+    buffer.seek(0)
+    return buffer
+
+
+async def _write_from(buffer, dst):
+    buffer.seek(0)
+    for chunk in iter(lambda: buffer.read(CHUNK_SIZE), b""):
+        result = dst.write(chunk)
+        if inspect.isawaitable(result):
+            await result
+        if hasattr(dst, "drain"):
+            await dst.drain()
+
+
+async def load_async(src, on_event=None):
+    """Load a drawing without blocking the event loop.
+
+    ``src`` is anything ``load()`` accepts, an object with an async
+    ``read()`` such as ``asyncio.StreamReader``, or an async iterator of
+    byte chunks. Async sources are read on the event loop, so their I/O
+    overlaps with conversions running on the executor.
+    """
+    if not _is_async_reader(src):
+        return await _run(engine.load, src, on_event, discard=_dispose)
+    spool = await _read_into(src, engine._spool())
+
+    def discard(future):
+        _dispose(future)
+        spool.close()
+
+    # On success the image keeps reading from the spool, so it stays open.
+    return await _run(engine.load, spool, on_event, discard=discard)
+
+
+async def save_async(image, dst, options, on_event=None):
+    """Save ``image`` without blocking the event loop.
+
+    ``dst`` is anything ``save()`` accepts, or an async writer: an
+    object with a coroutine ``write()`` or with ``write()`` and
+    ``drain()`` like ``asyncio.StreamWriter``.
+    """
+    if not _is_async_writer(dst):
+        return await _run(engine.save, image, dst, options, on_event)
+    buffer = engine._spool()
+    await _run(engine.save, image, buffer, options, on_event, discard=_closing(buffer))
+    with buffer:
+        await _write_from(buffer, dst)
+
+
+async def convert_async(src, targets, raster_opts=None, cache=None, on_event=None):
+    """Asynchronous ``convert()`` that also accepts async sources and writers."""
+    if isinstance(targets, (str, os.PathLike)):
+        targets = [targets]
+    spools = []
+    if _is_async_reader(src):
+        src = await _read_into(src, engine._spool())
+        spools.append(src)
+    buffers = {}
+    sync_targets = []
+    for i, target in enumerate(targets):
+        if not isinstance(target, (str, os.PathLike)) and _is_async_writer(target[0]):
+            buffers[i] = engine._spool()
+            spools.append(buffers[i])
+            target = (buffers[i], target[1])
+        sync_targets.append(target)
+    close = _closing(*spools)
+    await _run(engine.convert, src, sync_targets, raster_opts, cache, on_event, discard=close)
+    try:
+        for i, buffer in buffers.items():
+            await _write_from(buffer, targets[i][0])
+    finally:
+        close(None)
+    return [engine.target_path(target) for target in targets]
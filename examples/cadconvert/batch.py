@@ -0,0 +1,251 @@
+import collections
+import concurrent.futures as cf
+import glob
+import multiprocessing
+import os
+import signal
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+from .formats import INPUT_FORMATS, format_of
+
+KILL_SIGNAL = getattr(signal, "SIGKILL", signal.SIGTERM)
+MAX_ATTEMPTS = 2
+
+_started = None
+
+
+def expand_inputs(patterns):
+    """Return ``(src, stem)`` pairs for files, directories and glob patterns.
+
+    ``stem`` is the output name without extension; files found under a
+    directory keep their path relative to it.
+    """
+    inputs = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for dirpath, dirnames, filenames in os.walk(pattern):
+                dirnames.sort()
+                for name in sorted(filenames):
+                    if format_of(name) in INPUT_FORMATS:
+                        src = os.path.join(dirpath, name)
+                        inputs.append((src, os.path.splitext(os.path.relpath(src, pattern))[0]))
+        else:
+            for src in sorted(glob.glob(pattern, recursive=True)) or [pattern]:
+                inputs.append((src, os.path.splitext(os.path.basename(src))[0]))
+    return inputs
+
+
+def plan(inputs, formats, output_dir):
+    """Return ``(src, targets)`` jobs, one target per format under ``output_dir``.
+
+    An input listed twice is planned once. Two inputs that would write
+    the same target, such as ``plan.dwg`` and ``plan.dxf``, raise
+    ``ValueError`` rather than overwrite each other.
+    """
+    jobs = []
+    sources = {}
+    for src, stem in inputs:
+        targets = [os.path.join(output_dir, "%s.%s" % (stem, fmt)) for fmt in formats]
+        real = os.path.realpath(src)
+        if any(sources.get(target, (None,))[0] == real for target in targets):
+            continue
+        for target in targets:
+            if sources.setdefault(target, (real, src))[0] != real:
+                raise ValueError("%s and %s both convert to %s" % (sources[target][1], src, target))
+        jobs.append((src, targets))
+    return jobs
+
+
+def _result(src, status, seconds, bytes_out=0, error=None):
+    return {
+        "src": src,
+        "status": status,
+        "seconds": seconds,
+        "bytes_in": os.path.getsize(src) if os.path.exists(src) else 0,
+        "bytes_out": bytes_out,
+        "error": error,
+    }
+
+
+def _init_worker(started):
+    global _started
+    _started = started
+    try:
+        from . import engine  # noqa: F401  import aspose.cad once per worker
+    except Exception as e:
+        # The pool only reports a broken worker, so pass the reason on to the parent.
+        started.put((None, "%s: %s" % (type(e).__name__, e), os.getpid()))
+        raise
+
+
+def report_start(index, attempt):
+    """Tell the parent that this worker started ``index``; tasks call it first."""
+    if _started is not None:
+        _started.put((index, attempt, os.getpid()))
+
+
+def _convert_one(index, attempt, src, targets, raster_kwargs, cache=None):
+    from .engine import convert
+
+    report_start(index, attempt)
+    begin = time.perf_counter()
+    for target in targets:
+        os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+    convert(src, targets, raster_kwargs, cache)
+    return time.perf_counter() - begin, sum(os.path.getsize(target) for target in targets)
+
+
+def run_sequential(jobs, raster_kwargs=None, on_result=None, cache=None, task=_convert_one):
+    results = []
+    for index, (src, targets) in enumerate(jobs):
+        begin = time.perf_counter()
+        try:
+            seconds, bytes_out = task(index, 0, src, targets, raster_kwargs or {}, cache)
+        except Exception as e:
+            result = _result(src, "error", time.perf_counter() - begin, error=str(e))
+        else:
+            result = _result(src, "ok", seconds, bytes_out)
+        results.append(result)
+        if on_result is not None:
+            on_result(result)
+    return results
+
+
+def run_batch(jobs, workers=None, timeout=None, raster_kwargs=None, on_result=None, cache=None, task=_convert_one):
+    """Convert ``(src, targets)`` jobs on a pool of warm worker processes.
+
+    ``task(index, attempt, src, targets, raster_kwargs, cache)`` runs
+    one job in a worker, calls ``report_start()`` first and returns
+    ``(seconds, bytes_out)``.
+
+    A file that runs longer than ``timeout`` seconds has its worker
+    killed; the other files that were in flight on the broken pool are
+    resubmitted to a fresh one. If pools keep breaking before any file
+    starts, as when the worker initializer cannot import aspose.cad,
+    the remaining files fail with the initializer's error.
+    """
+    workers = workers or os.cpu_count() or 1
+    raster_kwargs = raster_kwargs or {}
+    ctx = multiprocessing.get_context()
+    # put() writes synchronously, so a start report survives a worker that crashes right after it.
+    started = ctx.SimpleQueue()
+    results = [None] * len(jobs)
+    # Submissions tag start reports so stale ones are ignored; crashes count only runs that started.
+    submissions = [0] * len(jobs)
+    crashes = [0] * len(jobs)
+    pending = collections.deque(range(len(jobs)))
+    running = {}
+    started_at = {}
+    executor = None
+    # Pools that broke before any job started, e.g. because the initializer failed.
+    idle_breaks = 0
+    pool_started = False
+    init_error = None
+
+    def finish(index, result):
+        results[index] = result
+        if on_result is not None:
+            on_result(result)
+
+    def drain_started():
+        nonlocal pool_started, init_error
+        while not started.empty():
+            index, attempt, pid = started.get()
+            if index is None:
+                init_error = attempt
+            elif attempt == submissions[index]:
+                started_at[index] = (time.perf_counter(), pid)
+                pool_started = True
+
+    def collect(future, index, charge=True):
+        """Record the outcome of ``future``; return False if its pool broke.
+
+        A job that was running when the pool broke on its own is charged
+        one crash. Jobs that had not started, or that were only lost
+        with a worker killed for another job's timeout, are requeued
+        without a charge.
+        """
+        src = jobs[index][0]
+        ran = started_at.pop(index, None) is not None
+        try:
+            seconds, bytes_out = future.result()
+        except BrokenProcessPool:
+            if charge and ran:
+                crashes[index] += 1
+                if crashes[index] >= MAX_ATTEMPTS:
+                    finish(index, _result(src, "error", 0.0, error="worker process died"))
+                    return False
+            pending.appendleft(index)
+            return False
+        except Exception as e:
+            finish(index, _result(src, "error", 0.0, error=str(e)))
+        else:
+            finish(index, _result(src, "ok", seconds, bytes_out))
+        return True
+
+    try:
+        while pending or running:
+            if executor is None:
+                pool_started = False
+                executor = cf.ProcessPoolExecutor(workers, mp_context=ctx, initializer=_init_worker, initargs=(started,))
+            while pending and len(running) < workers * 2:
+                index = pending.popleft()
+                submissions[index] += 1
+                src, targets = jobs[index]
+                running[executor.submit(task, index, submissions[index], src, targets, raster_kwargs, cache)] = index
+
+            done, _ = cf.wait(running, timeout=0.1 if timeout is not None else None, return_when=cf.FIRST_COMPLETED)
+            drain_started()
+
+            broken = killed = False
+            for future in done:
+                broken |= not collect(future, running.pop(future))
+
+            if timeout is not None:
+                now = time.perf_counter()
+                for future, index in list(running.items()):
+                    begin, pid = started_at.get(index, (now, None))
+                    if pid is not None and not future.done() and now - begin > timeout:
+                        del running[future]
+                        del started_at[index]
+                        try:
+                            os.kill(pid, KILL_SIGNAL)
+                        except OSError:
+                            pass
+                        finish(index, _result(jobs[index][0], "timeout", now - begin, error="timed out"))
+                        broken = killed = True
+
+            if broken:
+                cf.wait(running)
+                drain_started()
+                for future, index in running.items():
+                    collect(future, index, charge=not killed)
+                running.clear()
+                executor.shutdown(wait=True)
+                executor = None
+                if not killed and not pool_started:
+                    idle_breaks += 1
+                if idle_breaks >= MAX_ATTEMPTS:
+                    error = init_error or "worker process could not start"
+                    while pending:
+                        index = pending.popleft()
+                        finish(index, _result(jobs[index][0], "error", 0.0, error=error))
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+    return results
+
+
+def summarize(results, seconds):
+    count = collections.Counter(result["status"] for result in results)
+    megabytes = sum(result["bytes_in"] for result in results) / 1e6
+    return {
+        "files": len(results),
+        "ok": count["ok"],
+        "errors": count["error"],
+        "timeouts": count["timeout"],
+        "seconds": seconds,
+        "files_per_second": len(results) / seconds if seconds else 0.0,
+        "megabytes_per_second": megabytes / seconds if seconds else 0.0,
+    }
@@ -0,0 +1,133 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import re
+import sys
+import tempfile
+import time
+
+from .cache import library_version
+from .formats import normalize
+
+MATRIX_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "conversion")
+SCRIPT_NAME = re.compile(r"^convert-(?P<src>[0-9a-z]+)-to-(?P<dst>[0-9a-z]+)\.py$")
+
+
+def discover_pairs(matrix_dir=MATRIX_DIR):
+    """Return the ``(input, output)`` format pairs listed by the example scripts."""
+    pairs = []
+    for dirpath, _, filenames in os.walk(matrix_dir):
+        for name in filenames:
+            match = SCRIPT_NAME.match(name)
+            if match:
+                pairs.append((normalize(match.group("src")), normalize(match.group("dst"))))
+    return sorted(set(pairs))
+
+
+def corpus_files(corpus_dir):
+    """Map each input format to the sorted files of that format in ``corpus_dir``."""
+    files = {}
+    for name in sorted(os.listdir(corpus_dir)):
+        path = os.path.join(corpus_dir, name)
+        if os.path.isfile(path):
+            files.setdefault(normalize(os.path.splitext(name)[1]), []).append(path)
+    return files
+
+
+def _peak_rss():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _measure(job):
+    src, dst_fmt, raster_kwargs = job
+    from .engine import load, output_options, rasterization_options
+
+    record = {"input": src, "format": dst_fmt, "baseline_rss_bytes": _peak_rss()}
+    with tempfile.TemporaryDirectory() as tmp:
+        dst = os.path.join(tmp, "result." + dst_fmt)
+        try:
+            begin = time.perf_counter()
+            image = load(src)
+            record["load_seconds"] = time.perf_counter() - begin
+            with image:
+                options = output_options(dst_fmt, rasterization_options(**raster_kwargs))
+                begin = time.perf_counter()
+                image.save(dst, options)
+                record["save_seconds"] = time.perf_counter() - begin
+            record["output_bytes"] = os.path.getsize(dst)
+            record["status"] = "ok"
+        except Exception as e:
+            record["status"] = "error"
+            record["error"] = str(e)
+    record["peak_rss_bytes"] = _peak_rss()
+    return record
+
+
+def run(corpus_dir, pairs=None, raster_kwargs=None, on_record=None):
+    """Run every pair on the corpus, each conversion in a fresh process.
+
+    A fresh process per conversion keeps the peak RSS of one pair from
+    leaking into the next.
+    """
+    pairs = discover_pairs() if pairs is None else pairs
+    files = corpus_files(corpus_dir)
+    jobs = [(src, dst_fmt, raster_kwargs or {}) for src_fmt, dst_fmt in pairs for src in files.get(src_fmt, [])]
+    records = []
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(1, maxtasksperchild=1) as pool:
+        for record in pool.imap(_measure, jobs):
+            records.append(record)
+            if on_record is not None:
+                on_record(record)
+    return records
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="cadconvert.bench", description="Benchmark the conversion matrix.")
+    parser.add_argument("corpus", help="directory with the input drawings, one or more per format")
+    parser.add_argument("-o", "--output", default="-", help="JSON report path (default: stdout)")
+    parser.add_argument("--pair", dest="pairs", action="append", metavar="IN:OUT",
+                        help="benchmark only this pair, may be repeated (default: every example pair)")
+    parser.add_argument("--matrix", default=MATRIX_DIR, help="directory with the conversion example scripts")
+    parser.add_argument("--page-width", type=float, default=800.5)
+    parser.add_argument("--page-height", type=float, default=800.5)
+    parser.add_argument("--zoom", type=float, default=1.5)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.pairs:
+        pairs = [tuple(normalize(fmt) for fmt in pair.split(":", 1)) for pair in args.pairs]
+    else:
+        pairs = discover_pairs(args.matrix)
+    raster_kwargs = {"page_width": args.page_width, "page_height": args.page_height, "zoom": args.zoom}
+
+    def progress(record):
+        print("%s -> %s: %s" % (record["input"], record["format"], record["status"]), file=sys.stderr)
+
+    report = {
+        "aspose_cad_version": library_version(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "raster": raster_kwargs,
+        "results": run(args.corpus, pairs, raster_kwargs, progress),
+    }
+    if args.output == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0 if all(record["status"] == "ok" for record in report["results"]) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
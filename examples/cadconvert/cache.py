@@ -0,0 +1,139 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from importlib import metadata
+
+from .formats import format_of, normalize
+
+CHUNK_SIZE = 1024 * 1024
+# Eviction trims the cache to this fraction of max_bytes, so a full scan is needed only
+# after this process has written the remaining headroom.
+EVICT_TO = 0.9
+
+# Estimated cache size per directory in this process. A RenderCache is pickled into every
+# batch task, so the estimate cannot live on the instance.
+_estimates = {}
+
+
+def library_version():
+    try:
+        return metadata.version("aspose-cad")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class RenderCache:
+    """Content-addressed store of conversion results shared between processes.
+
+    Entries are keyed by the input bytes, the output format, the
+    rasterization options and the aspose-cad version. Writes are atomic
+    renames, and the least recently used entries are evicted once the
+    cache grows past ``max_bytes``.
+
+    Each process keeps a running estimate of the cache size and scans
+    the directory only when its estimate passes ``max_bytes``. With
+    several processes sharing a directory, it can briefly exceed the
+    limit by what the others wrote since their last scan.
+    """
+
+    def __init__(self, directory, max_bytes=1024 ** 3):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def keys_for(self, src, targets, raster_kwargs):
+        """Return one cache key per target, or ``None`` where a target cannot be cached.
+
+        Only path sources, path targets and rasterization options given
+        as a ``rasterization_options()`` keyword dict are cacheable.
+        """
+        keys = [None] * len(targets)
+        if not isinstance(src, (str, os.PathLike)) or not (raster_kwargs is None or isinstance(raster_kwargs, dict)):
+            return keys
+        digest = file_digest(src)
+        # Unset options are None from the CLI and absent from API calls; both mean the default.
+        raster = {name: value for name, value in (raster_kwargs or {}).items() if value is not None}
+        for i, target in enumerate(targets):
+            if isinstance(target, (str, os.PathLike)):
+                fmt = format_of(os.fspath(target))
+            elif isinstance(target[0], (str, os.PathLike)) and isinstance(target[1], str):
+                fmt = normalize(target[1])
+            else:
+                continue
+            description = {
+                "version": library_version(),
+                "input": digest,
+                "format": fmt,
+                "raster": raster,
+            }
+            keys[i] = hashlib.sha256(json.dumps(description, sort_keys=True, default=str).encode()).hexdigest()
+        return keys
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    def fetch(self, key, dst):
+        """Copy the entry for ``key`` to ``dst`` and return whether it existed."""
+        path = self._path(key)
+        try:
+            shutil.copyfile(path, dst)
+            os.utime(path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def store(self, key, src):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as out, open(src, "rb") as f:
+                shutil.copyfileobj(f, out)
+                size = out.tell()
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        directory = os.path.abspath(self.directory)
+        estimate = _estimates.get(directory)
+        if estimate is None or estimate + size > self.max_bytes:
+            self.evict()
+        else:
+            _estimates[directory] = estimate + size
+
+    def evict(self):
+        """Scan the cache and, if it is over ``max_bytes``, drop the least recently used entries."""
+        entries = []
+        total = 0
+        for dirpath, _, filenames in os.walk(self.directory):
+            for name in filenames:
+                if name.startswith(".tmp-"):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+        if total > self.max_bytes:
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_bytes * EVICT_TO:
+                    break
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+        _estimates[os.path.abspath(self.directory)] = total
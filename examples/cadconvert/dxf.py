@@ -0,0 +1,333 @@
+import argparse
+import codecs
+import collections
+import json
+import mmap
+import operator
+import re
+import struct
+import sys
+
+BINARY_SENTINEL = b"AutoCAD Binary DXF\r\n\x1a\x00"
+# Blocks start small so header-only readers stop early, then grow to CHUNK_SIZE.
+# A decoded block costs several times its size in line objects, which bounds streaming memory.
+FIRST_CHUNK_SIZE = 64 * 1024
+CHUNK_SIZE = 1024 * 1024
+
+# Drawings before AutoCAD 2007 without a $DWGCODEPAGE are read as Windows Western.
+DEFAULT_CODEPAGE = "cp1252"
+
+STRING, DOUBLE, INT16, INT32, INT64, BOOL, BINARY = range(7)
+
+
+def _group_types():
+    types = [STRING] * 1072
+    spans = [
+        (10, 59, DOUBLE), (60, 79, INT16), (90, 99, INT32), (110, 149, DOUBLE), (160, 169, INT64),
+        (170, 179, INT16), (210, 239, DOUBLE), (270, 289, INT16), (290, 299, BOOL), (310, 319, BINARY),
+        (370, 389, INT16), (400, 409, INT16), (420, 429, INT32), (440, 459, INT32), (460, 469, DOUBLE),
+        (1004, 1004, BINARY), (1010, 1059, DOUBLE), (1060, 1070, INT16), (1071, 1071, INT32),
+    ]
+    for first, last, kind in spans:
+        types[first:last + 1] = [kind] * (last - first + 1)
+    return types
+
+
+GROUP_TYPES = _group_types()
+
+# Structural strings repeat across most records; interning shares one object per distinct value.
+INTERNED_CODES = frozenset([0, 2, 3, 5, 6, 7, 8, 100, 102, 105, 480, 481, *range(330, 370), *range(390, 400)])
+
+BINARY_FORMATS = {DOUBLE: struct.Struct("<d"), INT16: struct.Struct("<h"), INT32: struct.Struct("<i"),
+                  INT64: struct.Struct("<q")}
+
+
+def group_type(code):
+    return GROUP_TYPES[code] if 0 <= code < len(GROUP_TYPES) else STRING
+
+
+def _ascii_bool(value):
+    return int(value) != 0
+
+
+def _record_type(value):
+    return sys.intern(value.strip())
+
+
+def _ascii_converters():
+    # Numbers parse with surrounding blanks, and code 0 record types are stripped. Other
+    # strings keep their blanks: text split into 250-character chunks relies on them.
+    converters = []
+    for code, kind in enumerate(GROUP_TYPES):
+        if kind == DOUBLE:
+            converters.append(float)
+        elif code == 0:
+            converters.append(_record_type)
+        elif kind == STRING:
+            converters.append(sys.intern if code in INTERNED_CODES else str)
+        elif kind == BINARY:
+            converters.append(bytes.fromhex)
+        elif kind == BOOL:
+            converters.append(_ascii_bool)
+        else:
+            converters.append(int)
+    return converters
+
+
+# One C-level callable per group code, so converting a value is a single table lookup and call.
+ASCII_CONVERTERS = _ascii_converters()
+
+
+class _CodeTable(dict):
+    """Map the text of a group-code line to its code, parsing each distinct text once."""
+
+    def __missing__(self, text):
+        code = self[text] = int(text)
+        return code
+
+
+class _ConverterTable(dict):
+    """Map the text of a group-code line to the converter of its value."""
+
+    def __missing__(self, text):
+        code = int(text)
+        converter = self[text] = ASCII_CONVERTERS[code] if 0 <= code < len(ASCII_CONVERTERS) else str
+        return converter
+
+
+_CODES = _CodeTable()
+_ASCII_CONVERTERS_BY_TEXT = _ConverterTable()
+_call = getattr(operator, "call", lambda function, value: function(value))
+
+
+# A "0" line followed by an "EOF" line can only be the end-of-file pair: EOF is not a code.
+EOF_PAIR = re.compile(r"^[ \t]*0[ \t]*\r?\n[ \t]*EOF[ \t]*(?=\r?$)", re.M)
+
+
+def _ascii_tokens(f, encoding):
+    separator = None
+    tail = f.read(len(codecs.BOM_UTF8))
+    if tail == codecs.BOM_UTF8:
+        tail = b""
+    pending = None
+    size = FIRST_CHUNK_SIZE
+    block = f.read(size)
+    while True:
+        data = tail + block
+        if separator is None:
+            separator = b"\r\n" if b"\r\n" in data else b"\n"
+            line_end = separator.decode()
+        if block:
+            cut = data.rfind(separator)
+            if cut < 0:
+                tail = data
+                size = min(size * 2, CHUNK_SIZE)
+                block = f.read(size)
+                continue
+            # Decoding a whole block at once is far cheaper than decoding line by line.
+            text = data[:cut].decode(encoding, "replace")
+            tail = data[cut + len(separator):]
+        else:
+            text = data.decode(encoding, "replace")
+        if pending is not None:
+            text = pending + line_end + text
+        # Whatever follows 0/EOF is not DXF, so it is cut off before any value is converted.
+        eof = EOF_PAIR.search(text)
+        if eof is not None:
+            text = text[:eof.end()]
+        lines = text.split(line_end) if text else []
+        pending = lines.pop() if len(lines) % 2 else None
+        # A file uses only a few hundred distinct code lines, so both lookups hit a dict in C.
+        code_lines = lines[0::2]
+        codes = map(_CODES.__getitem__, code_lines)
+        values = map(_call, map(_ASCII_CONVERTERS_BY_TEXT.__getitem__, code_lines), lines[1::2])
+        yield from zip(codes, values)
+        if eof is not None or not block:
+            return
+        size = min(size * 2, CHUNK_SIZE)
+        block = f.read(size)
+
+
+def _binary_tokens(buf, encoding):
+    pos = len(BINARY_SENTINEL)
+    end = len(buf)
+    if end < pos + 2:
+        raise ValueError("truncated binary DXF")
+    # R13 and later write two-byte group codes, so the leading "0" code has a zero high byte.
+    two_byte = buf[pos + 1] == 0
+    unpack_code = struct.Struct("<H").unpack_from
+    while pos < end:
+        if not two_byte:
+            code = buf[pos]
+            pos += 1
+        if two_byte or code == 255:
+            if pos + 2 > end:
+                raise ValueError("truncated binary DXF")
+            (code,) = unpack_code(buf, pos)
+            pos += 2
+        kind = group_type(code)
+        if kind == STRING:
+            stop = buf.find(b"\x00", pos)
+            if stop < 0:
+                raise ValueError("truncated binary DXF")
+            value = buf[pos:stop].decode(encoding, "replace")
+            if code in INTERNED_CODES:
+                value = sys.intern(value)
+            pos = stop + 1
+        elif kind == BOOL:
+            if pos >= end:
+                raise ValueError("truncated binary DXF")
+            value = buf[pos] != 0
+            pos += 1
+        elif kind == BINARY:
+            if pos >= end or pos + 1 + buf[pos] > end:
+                raise ValueError("truncated binary DXF")
+            length = buf[pos]
+            value = buf[pos + 1:pos + 1 + length]
+            pos += 1 + length
+        else:
+            fmt = BINARY_FORMATS[kind]
+            if pos + fmt.size > end:
+                raise ValueError("truncated binary DXF")
+            (value,) = fmt.unpack_from(buf, pos)
+            pos += fmt.size
+        yield code, value
+        if code == 0 and value == "EOF":
+            return
+
+
+def codepage_encoding(codepage):
+    """Return the Python codec of a ``$DWGCODEPAGE`` value such as ``ANSI_1252``."""
+    name = codepage.upper()
+    for prefix in ("ANSI_", "DOS"):
+        if name.startswith(prefix) and name[len(prefix):].isdigit():
+            name = "cp" + name[len(prefix):]
+    try:
+        return codecs.lookup(name).name
+    except LookupError:
+        return DEFAULT_CODEPAGE
+
+
+def _header_encoding(pairs):
+    """Pick the text encoding from the HEADER section of latin-1 decoded ``pairs``.
+
+    AutoCAD 2007 (AC1021) and later write UTF-8; earlier releases write
+    the ANSI code page named by ``$DWGCODEPAGE``.
+    """
+    version = codepage = variable = None
+    try:
+        for code, value in pairs:
+            if code == 0 and value == "SECTION":
+                if next(pairs, (None, None))[1] != "HEADER":
+                    break
+            elif code == 0 and value == "ENDSEC":
+                break
+            elif code == 9:
+                variable = value
+            elif variable == "$ACADVER" and code == 1:
+                version = value
+            elif variable == "$DWGCODEPAGE" and code == 3:
+                codepage = value
+    finally:
+        pairs.close()
+    if version is not None and version >= "AC1021":
+        return "utf-8"
+    return codepage_encoding(codepage) if codepage else DEFAULT_CODEPAGE
+
+
+def tokens(path, encoding=None):
+    """Yield ``(group_code, value)`` pairs of an ASCII or binary DXF file.
+
+    Values are typed by group code. Record types (code 0) are stripped;
+    other strings keep their blanks. Anything after ``0/EOF`` is
+    ignored. ASCII files are read and decoded in large blocks and
+    converted a batch at a time; binary files are parsed straight from
+    a memory map. Handles, layer names and other structural strings are
+    interned. Without ``encoding``, text is decoded as the file's
+    ``$ACADVER`` and ``$DWGCODEPAGE`` header variables say.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(BINARY_SENTINEL)) == BINARY_SENTINEL:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                if encoding is None:
+                    encoding = _header_encoding(_binary_tokens(buf, "latin-1"))
+                yield from _binary_tokens(buf, encoding)
+        else:
+            if encoding is None:
+                f.seek(0)
+                encoding = _header_encoding(_ascii_tokens(f, "latin-1"))
+            f.seek(0)
+            yield from _ascii_tokens(f, encoding)
+
+
+class Entity(collections.namedtuple("Entity", "type handle layer tags")):
+    """One entity record: its type, handle, layer and raw ``(code, value)`` tags."""
+
+    __slots__ = ()
+
+    def get(self, code, default=None):
+        for tag_code, value in self.tags:
+            if tag_code == code:
+                return value
+        return default
+
+
+def iter_entities(path, types=None, layers=None, encoding=None):
+    """Yield the ENTITIES section of a DXF file as ``Entity`` records.
+
+    The file is streamed, so memory stays bounded by one read block and
+    one entity whatever the file size. ``types`` and ``layers`` limit
+    the records to those entity types (e.g. ``{"TEXT", "INSERT"}``) and
+    layer names; tags of entities of other types are not kept. Complex
+    entities are flat as in the file: a POLYLINE is followed by its
+    VERTEX and SEQEND records.
+    """
+    types = None if types is None else {name.upper() for name in types}
+    layers = None if layers is None else set(layers)
+    pairs = tokens(path, encoding)
+    try:
+        in_entities = False
+        current = None
+        tags = None
+        for code, value in pairs:
+            if code != 0:
+                if tags is not None:
+                    tags.append((code, value))
+                elif code == 2 and current == "SECTION":
+                    in_entities = value == "ENTITIES"
+                continue
+            if tags is not None:
+                entity = _entity(current, tags)
+                if layers is None or entity.layer in layers:
+                    yield entity
+            current = value
+            tags = [] if in_entities and value not in ("ENDSEC", "SECTION") and (types is None or value in types) else None
+            if in_entities and value == "ENDSEC":
+                in_entities = False
+    finally:
+        pairs.close()
+
+
+def _entity(kind, tags):
+    handle = layer = None
+    for code, value in tags:
+        if code == 5:
+            handle = value
+        elif code == 8:
+            layer = value
+    return Entity(kind, handle, layer, tags)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="cadconvert.dxf", description="Print DXF entities as JSON lines.")
+    parser.add_argument("input", help="ASCII or binary DXF file")
+    parser.add_argument("--type", dest="types", action="append", help="entity type to print, may be repeated")
+    parser.add_argument("--layer", dest="layers", action="append", help="layer to print, may be repeated")
+    args = parser.parse_args(argv)
+    for entity in iter_entities(args.input, args.types, args.layers):
+        print(json.dumps(entity._asdict(), default=bytes.hex))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
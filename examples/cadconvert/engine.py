@@ -0,0 +1,216 @@
+import contextlib
+import os
+import shutil
+import tempfile
+import time
+
+import aspose.cad as cad
+
+from .formats import OUTPUT_OPTIONS, format_of, normalize
+
+# Streams larger than this are buffered in a temporary file, not in memory.
+SPOOL_LIMIT = 64 * 1024 * 1024
+
+
+def rasterization_options(page_width=None, page_height=None, zoom=None, layers=None, background_color=None,
+                          quality=None):
+    """Build ``CadRasterizationOptions`` from plain values.
+
+    ``quality`` is ``"low"``, ``"medium"`` or ``"high"`` and applies to
+    text, hatch and arc rendering; ``"low"`` is the preview level.
+    """
+    raster = cad.imageoptions.CadRasterizationOptions()
+    if page_width is not None:
+        raster.page_width = page_width
+    if page_height is not None:
+        raster.page_height = page_height
+    if zoom is not None:
+        raster.zoom = zoom
+    if layers is not None:
+        raster.layers = [layers] if isinstance(layers, str) else list(layers)
+    if isinstance(background_color, str):
+        background_color = getattr(cad.Color, background_color)
+    if background_color is not None:
+        raster.background_color = background_color
+    if quality is not None:
+        value = getattr(cad.imageoptions.RasterizationQualityValue, quality.upper())
+        raster.quality = cad.imageoptions.RasterizationQuality()
+        raster.quality.text = value
+        raster.quality.hatch = value
+        raster.quality.arc = value
+    return raster
+
+
+def output_options(fmt, raster_opts=None):
+    fmt = normalize(fmt)
+    if fmt not in OUTPUT_OPTIONS:
+        raise ValueError("unsupported output format: %r" % fmt)
+    if fmt == "tiff":
+        options = cad.imageoptions.TiffOptions(cad.fileformats.tiff.enums.TiffExpectedFormat.DEFAULT)
+    else:
+        options = getattr(cad.imageoptions, OUTPUT_OPTIONS[fmt])()
+    if raster_opts is not None:
+        options.vector_rasterization_options = raster_opts
+    return options
+
+
+def _seekable(stream):
+    try:
+        return stream.seekable()
+    except AttributeError:
+        return False
+
+
+def _spool():
+    return tempfile.SpooledTemporaryFile(max_size=SPOOL_LIMIT)
+
+
+@contextlib.contextmanager
+def _stage(on_event, stage, **fields):
+    """Report the start and end of ``stage`` to ``on_event``.
+
+    The caller adds end-of-stage fields to the yielded dict. Both
+    events carry a ``timestamp``; the end event adds wall seconds, CPU
+    seconds of the calling thread, and ``error`` if the stage raised.
+    CPU time is per thread so that concurrent conversions, as run by
+    ``cadconvert.aio``, do not count each other's work; work the
+    library hands to threads of its own is not included.
+    """
+    end = {}
+    if on_event is None:
+        yield end
+        return
+    on_event(dict(fields, stage=stage, phase="start", timestamp=time.time()))
+    wall, cpu = time.perf_counter(), time.thread_time()
+    try:
+        yield end
+    except BaseException as e:
+        end["error"] = repr(e)
+        raise
+    finally:
+        on_event(dict(fields, stage=stage, phase="end", timestamp=time.time(), wall_seconds=time.perf_counter() - wall,
+                      cpu_seconds=time.thread_time() - cpu, **end))
+
+
+def _entity_count(image):
+    entities = getattr(image, "entities", None)
+    return None if entities is None else len(entities)
+
+
+def _source_name(src):
+    if isinstance(src, (str, os.PathLike)):
+        return os.fspath(src)
+    return getattr(src, "name", None)
+
+
+def load(src, on_event=None):
+    """Load a drawing from a path or a readable binary stream.
+
+    Paths and real files are handed to the library as they are, so the
+    drawing is not copied into Python memory. Streams that cannot seek,
+    such as pipes or request bodies, are buffered first because the
+    readers need random access; past ``SPOOL_LIMIT`` bytes the buffer
+    moves to a temporary file.
+
+    ``on_event`` receives the start and end events of the ``load``
+    stage; the end event also counts the drawing's entities.
+    """
+    with _stage(on_event, "load", source=_source_name(src)) as end:
+        if isinstance(src, (str, os.PathLike)):
+            image = cad.Image.load(os.fspath(src))
+        elif _seekable(src):
+            image = cad.Image.load(src)
+        else:
+            # Not closed here: the image may keep reading from it after load.
+            buffer = _spool()
+            shutil.copyfileobj(src, buffer)
+            buffer.seek(0)
+            image = cad.Image.load(buffer)
+        if on_event is not None:
+            end["entities"] = _entity_count(image)
+    return image
+
+
+def save(image, dst, options, on_event=None):
+    """Save ``image`` to a path or a writable binary stream.
+
+    ``on_event`` receives the start and end events of the ``save``
+    stage; the end event also carries the number of bytes written.
+    """
+    with _stage(on_event, "save", target=_source_name(dst), options=type(options).__name__) as end:
+        if isinstance(dst, (str, os.PathLike)):
+            image.save(os.fspath(dst), options)
+            end["bytes_written"] = os.path.getsize(dst)
+        elif _seekable(dst):
+            start = dst.tell()
+            image.save(dst, options)
+            end["bytes_written"] = dst.tell() - start
+        else:
+            with _spool() as buffer:
+                image.save(buffer, options)
+                end["bytes_written"] = buffer.tell()
+                buffer.seek(0)
+                shutil.copyfileobj(buffer, dst)
+
+
+def resolve_target(target, raster_opts=None):
+    """Return ``(dst, options)`` for a path, ``(dst, fmt)`` or ``(dst, options)`` target.
+
+    ``dst`` is a path or a writable binary stream; streams need an
+    explicit format or options.
+    """
+    if isinstance(target, (str, os.PathLike)):
+        return target, output_options(format_of(os.fspath(target)), raster_opts)
+    path, options = target
+    if isinstance(options, str):
+        options = output_options(options, raster_opts)
+    return path, options
+
+
+def target_path(target):
+    return target if isinstance(target, (str, os.PathLike)) else target[0]
+
+
+def save_many(image, targets, raster_opts=None, on_event=None):
+    """Save one loaded ``image`` to every target, sharing ``raster_opts``."""
+    saved = []
+    for target in targets:
+        dst, options = resolve_target(target, raster_opts)
+        save(image, dst, options, on_event)
+        saved.append(dst)
+    return saved
+
+
+def convert(src, targets, raster_opts=None, cache=None, on_event=None):
+    """Load ``src`` once and save it to every target in ``targets``.
+
+    ``src`` is a path or a readable binary stream. A target is a path
+    whose extension names the format, or a ``(dst, fmt)`` /
+    ``(dst, options)`` pair where ``dst`` is a path or a stream.
+    ``raster_opts`` is a ``CadRasterizationOptions`` or a dict of
+    ``rasterization_options()`` keywords. With a ``RenderCache``,
+    targets found in the cache are copied from it, and the drawing is
+    loaded only if some target is missing. ``on_event`` receives the
+    stage events of ``load()`` and ``save()``.
+    """
+    if isinstance(targets, (str, os.PathLike)):
+        targets = [targets]
+    keys = [None] * len(targets)
+    if cache is not None:
+        keys = cache.keys_for(src, targets, raster_opts)
+    if raster_opts is None or isinstance(raster_opts, dict):
+        raster_opts = rasterization_options(**(raster_opts or {}))
+    misses = [i for i, (target, key) in enumerate(zip(targets, keys)) if key is None or not cache.fetch(key, target_path(target))]
+    if misses:
+        with load(src, on_event) as image:
+            save_many(image, [targets[i] for i in misses], raster_opts, on_event)
+        for i in misses:
+            if keys[i] is not None:
+                cache.store(keys[i], target_path(targets[i]))
+    return [target_path(target) for target in targets]
+
+
+def preview(src, dst, size=256, background_color=None, cache=None):
+    """Render a ``size`` pixel square thumbnail of ``src`` at preview quality."""
+    raster_kwargs = {"page_width": size, "page_height": size, "background_color": background_color, "quality": "low"}
+    return convert(src, dst, raster_kwargs, cache)[0]
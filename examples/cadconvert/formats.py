@@ -0,0 +1,57 @@
+import os
+
+INPUT_FORMATS = (
+    "3ds", "cf2", "cgm", "collada", "dgn", "dwf", "dwfx", "dwg", "dwt", "dxb", "dxf",
+    "fbx", "glb", "gltf", "ifc", "iges", "obj", "plt", "stl", "stp", "svg", "u3d",
+)
+
+OUTPUT_OPTIONS = {
+    "3ds": "ThreeDSOptions",
+    "bmp": "BmpOptions",
+    "cgm": "CgmOptions",
+    "dicom": "DicomOptions",
+    "dwf": "DwfOptions",
+    "dwfx": "DwfxOptions",
+    "dxf": "DxfOptions",
+    "emf": "EmfOptions",
+    "fbx": "FbxOptions",
+    "gif": "GifOptions",
+    "glb": "GlbOptions",
+    "gltf": "GltfOptions",
+    "ifc": "IfcOptions",
+    "jpeg": "JpegOptions",
+    "jpeg2000": "Jpeg2000Options",
+    "obj": "ObjOptions",
+    "pdf": "PdfOptions",
+    "png": "PngOptions",
+    "psd": "PsdOptions",
+    "stp": "StpOptions",
+    "svg": "SvgOptions",
+    "tiff": "TiffOptions",
+    "u3d": "U3dOptions",
+    "webp": "WebPOptions",
+    "wmf": "WmfOptions",
+}
+
+# Keyword arguments of engine.rasterization_options(), for checking options without aspose.cad.
+RASTER_OPTIONS = ("page_width", "page_height", "zoom", "layers", "background_color", "quality")
+
+ALIASES = {
+    "dae": "collada",
+    "dcm": "dicom",
+    "igs": "iges",
+    "j2k": "jpeg2000",
+    "jp2": "jpeg2000",
+    "jpg": "jpeg",
+    "step": "stp",
+    "tif": "tiff",
+}
+
+
+def normalize(fmt):
+    fmt = fmt.lower().lstrip(".")
+    return ALIASES.get(fmt, fmt)
+
+
+def format_of(path):
+    return normalize(os.path.splitext(path)[1])
@@ -0,0 +1,144 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+
+from .batch import expand_inputs, report_start, run_batch, run_sequential, summarize
+from .formats import RASTER_OPTIONS, normalize
+
+
+def load_job_file(path):
+    with open(path, encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError("YAML job files require PyYAML: pip install PyYAML")
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+def _check_options(options, where):
+    unknown = sorted(set(options) - set(RASTER_OPTIONS))
+    if unknown:
+        raise ValueError("unknown option %s in %s; expected one of %s"
+                         % (", ".join(map(repr, unknown)), where, ", ".join(RASTER_OPTIONS)))
+
+
+def build_plan(spec, base_dir="."):
+    """Turn a job spec into one ``(src, groups)`` unit per distinct input.
+
+    ``groups`` is a list of ``(raster_kwargs, [(fmt, [dst, ...]), ...])``:
+    targets that share identical options are rendered from one
+    rasterization options object, and targets that also share a format
+    are saved once and copied to the other paths. Unknown presets and
+    option names raise ``ValueError`` here rather than in the workers.
+    """
+    presets = spec.get("presets", {})
+    for preset, options in presets.items():
+        _check_options(options, "preset %r" % preset)
+    units = {}
+    destinations = {}
+    for job in spec["jobs"]:
+        output_dir = os.path.join(base_dir, job.get("output_dir", spec.get("output_dir", ".")))
+        inputs = expand_inputs([os.path.join(base_dir, pattern) for pattern in job["inputs"]])
+        for target in job["targets"]:
+            fmt = normalize(target["format"])
+            preset = target.get("preset")
+            if preset is not None and preset not in presets:
+                raise ValueError("unknown preset: %r" % preset)
+            _check_options(target.get("options", {}), "%s target options" % fmt)
+            raster_kwargs = dict(presets.get(preset, {}), **target.get("options", {}))
+            options_key = json.dumps(raster_kwargs, sort_keys=True)
+            name = target.get("name", "{stem}.{fmt}")
+            for src, stem in inputs:
+                dst = os.path.join(output_dir, name.format(stem=stem, fmt=fmt, preset=preset or ""))
+                identity = (src, fmt, options_key)
+                if dst in destinations:
+                    if destinations[dst] != identity:
+                        raise ValueError("conflicting targets for %s; give them distinct names" % dst)
+                    continue
+                destinations[dst] = identity
+                groups = units.setdefault(src, {})
+                kwargs, outputs = groups.setdefault(options_key, (raster_kwargs, {}))
+                outputs.setdefault(fmt, []).append(dst)
+    return [(src, [(kwargs, list(outputs.items())) for kwargs, outputs in groups.values()])
+            for src, groups in units.items()]
+
+
+def plan_stats(plan):
+    groups = [group for _, unit in plan for group in unit]
+    outputs = [output for _, group_outputs in groups for output in group_outputs]
+    return {
+        "loads": len(plan),
+        "option_sets": len(groups),
+        "saves": len(outputs),
+        "targets": sum(len(dsts) for _, dsts in outputs),
+    }
+
+
+def _run_unit(index, attempt, src, groups, raster_kwargs=None, cache=None):
+    from .engine import load, output_options, rasterization_options, save
+
+    report_start(index, attempt)
+    begin = time.perf_counter()
+    bytes_out = 0
+    with load(src) as image:
+        for kwargs, outputs in groups:
+            raster = rasterization_options(**kwargs)
+            for fmt, dsts in outputs:
+                for dst in dsts:
+                    os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+                save(image, dsts[0], output_options(fmt, raster))
+                for dst in dsts[1:]:
+                    shutil.copyfile(dsts[0], dst)
+                bytes_out += os.path.getsize(dsts[0]) * len(dsts)
+    return time.perf_counter() - begin, bytes_out
+
+
+def run_plan(plan, workers=1, timeout=None, on_result=None):
+    if workers == 1 and timeout is None:
+        return run_sequential(plan, on_result=on_result, task=_run_unit)
+    return run_batch(plan, workers or None, timeout, on_result=on_result, task=_run_unit)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="cadconvert.jobs", description="Run a declarative conversion job file.")
+    parser.add_argument("job_file", help="JSON or YAML job file")
+    parser.add_argument("-j", "--jobs", type=int, default=0, help="worker processes; 0 uses one per CPU")
+    parser.add_argument("--timeout", type=float, help="seconds allowed per input")
+    parser.add_argument("--dry-run", action="store_true", help="print the execution plan and exit")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    spec = load_job_file(args.job_file)
+    try:
+        plan = build_plan(spec, os.path.dirname(os.path.abspath(args.job_file)))
+    except ValueError as e:
+        print("cadconvert.jobs: %s" % e, file=sys.stderr)
+        return 2
+    stats = plan_stats(plan)
+    if args.dry_run:
+        json.dump({"stats": stats, "plan": plan}, sys.stdout, indent=2)
+        print()
+        return 0
+
+    def report(result):
+        if result["status"] != "ok":
+            print("%s: %s: %s" % (result["src"], result["status"], result["error"]), file=sys.stderr)
+
+    begin = time.perf_counter()
+    results = run_plan(plan, args.jobs, args.timeout, report)
+    summary = dict(summarize(results, time.perf_counter() - begin), **stats)
+    summary["worker_seconds"] = sum(result["seconds"] for result in results)
+    json.dump(summary, sys.stdout, indent=2)
+    print()
+    return 0 if summary["ok"] == summary["files"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+import argparse
+import concurrent.futures
+import os
+import sys
+import tempfile
+
+from .formats import format_of
+
+PAGE_FORMATS = ("pdf", "tiff")
+MODEL_SPACE = "Model"
+
+_image = None
+_raster_kwargs = None
+
+
+def layout_names(src):
+    """Return the paper-space layouts of ``src`` in tab order, or model space if there are none."""
+    from .engine import load
+
+    with load(src) as image:
+        layouts = image.layouts
+        tabs = [(layouts[name].tab_order, name) for name in layouts.keys() if name != MODEL_SPACE]
+    return [name for _, name in sorted(tabs)] or [MODEL_SPACE]
+
+
+def _init_worker(src, raster_kwargs):
+    global _image, _raster_kwargs
+    from .engine import load
+
+    _image = load(src)
+    _raster_kwargs = raster_kwargs
+
+
+def _render_layout(name, fmt, directory):
+    from .engine import output_options, rasterization_options
+
+    raster = rasterization_options(**_raster_kwargs)
+    raster.layouts = [name]
+    fd, path = tempfile.mkstemp(suffix="." + fmt, dir=directory)
+    os.close(fd)
+    _image.save(path, output_options(fmt, raster))
+    return path
+
+
+class _PdfAssembler:
+    def __init__(self, dst):
+        try:
+            from pypdf import PdfWriter
+        except ImportError:
+            raise ImportError("assembling PDF layouts requires pypdf: pip install pypdf")
+        self.dst = dst
+        self.writer = PdfWriter()
+
+    def add(self, path):
+        self.writer.append(path)
+
+    def close(self):
+        self.writer.write(self.dst)
+        self.writer.close()
+
+
+class _TiffAssembler:
+    def __init__(self, dst):
+        try:
+            from PIL import Image, TiffImagePlugin
+        except ImportError:
+            raise ImportError("assembling TIFF layouts requires Pillow: pip install Pillow")
+        self.open = Image.open
+        self.writer = TiffImagePlugin.AppendingTiffWriter(dst, True)
+
+    def add(self, path):
+        with self.open(path) as page:
+            for frame in range(getattr(page, "n_frames", 1)):
+                page.seek(frame)
+                page.save(self.writer, "TIFF")
+                self.writer.newFrame()
+
+    def close(self):
+        self.writer.close()
+
+
+def export_layouts(src, dst, layouts=None, raster_kwargs=None, workers=None):
+    """Render the paper-space ``layouts`` of ``src`` in parallel into one multi-page ``dst``.
+
+    Each worker process loads the drawing once and renders the layouts
+    it is given to single-page files. Pages are handed to the assembler
+    in layout order as soon as every earlier page is done, and their
+    files are removed right away. A TIFF is written page by page; pypdf
+    keeps every PDF page in memory until the document is written at the
+    end. ``dst`` must be a PDF (needs pypdf) or a TIFF (needs Pillow).
+    """
+    fmt = format_of(dst)
+    if fmt not in PAGE_FORMATS:
+        raise ValueError("multi-page export supports %s, not %r" % (", ".join(PAGE_FORMATS), fmt))
+    if layouts is None:
+        layouts = layout_names(src)
+    if not layouts:
+        raise ValueError("no layouts to export")
+    assembler = _PdfAssembler(dst) if fmt == "pdf" else _TiffAssembler(dst)
+    workers = min(workers or os.cpu_count() or 1, len(layouts)) or 1
+    try:
+        with tempfile.TemporaryDirectory() as tmp, concurrent.futures.ProcessPoolExecutor(
+                workers, initializer=_init_worker, initargs=(src, raster_kwargs or {})) as pool:
+            for path in pool.map(_render_layout, layouts, [fmt] * len(layouts), [tmp] * len(layouts)):
+                assembler.add(path)
+                os.unlink(path)
+    except BaseException:
+        assembler.close()
+        os.unlink(dst)
+        raise
+    assembler.close()
+    return list(layouts)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="cadconvert.layouts",
+                                     description="Export drawing layouts in parallel to one multi-page PDF or TIFF.")
+    parser.add_argument("input", help="drawing to export")
+    parser.add_argument("output", help="multi-page .pdf or .tiff")
+    parser.add_argument("--layout", dest="layouts", action="append",
+                        help="layout to export, may be repeated (default: all paper-space layouts, in tab order)")
+    parser.add_argument("-j", "--jobs", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--page-width", type=float)
+    parser.add_argument("--page-height", type=float)
+    parser.add_argument("--background", help="background color name, e.g. white")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    raster_kwargs = {"page_width": args.page_width, "page_height": args.page_height, "background_color": args.background}
+    try:
+        layouts = export_layouts(args.input, args.output, args.layouts, raster_kwargs, args.jobs)
+    except ValueError as e:
+        print("cadconvert.layouts: %s" % e, file=sys.stderr)
+        return 2
+    print("%d layouts written to %s" % (len(layouts), args.output))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
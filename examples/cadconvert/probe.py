@@ -0,0 +1,239 @@
+import argparse
+import json
+import os
+import re
+import struct
+import sys
+import zipfile
+from xml.etree import ElementTree
+
+from .formats import format_of
+
+ACAD_VERSIONS = {
+    "AC1009": "R12",
+    "AC1012": "R13",
+    "AC1014": "R14",
+    "AC1015": "2000",
+    "AC1018": "2004",
+    "AC1021": "2007",
+    "AC1024": "2010",
+    "AC1027": "2013",
+    "AC1032": "2018",
+}
+
+INSUNITS = {
+    0: None, 1: "inches", 2: "feet", 3: "miles", 4: "millimeters", 5: "centimeters", 6: "meters",
+    7: "kilometers", 8: "microinches", 9: "mils", 10: "yards", 11: "angstroms", 12: "nanometers",
+    13: "microns", 14: "decimeters", 15: "decameters", 16: "hectometers", 17: "gigameters",
+    18: "astronomical units", 19: "light years", 20: "parsecs",
+}
+
+OLE_SIGNATURE = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+FBX_SIGNATURE = b"Kaydara FBX Binary  \x00"
+STEP_HEADER_LIMIT = 64 * 1024
+
+
+def _info(path, fmt):
+    return {
+        "path": path,
+        "format": fmt,
+        "size": os.path.getsize(path),
+        "version": None,
+        "units": None,
+        "extents": None,
+        "layers": None,
+        "layouts": None,
+    }
+
+
+def _probe_dwg(path, info):
+    with open(path, "rb") as f:
+        magic = f.read(6).decode("ascii", "replace")
+    info["version"] = ACAD_VERSIONS.get(magic, magic)
+
+
+def _probe_dxf(path, info):
+    from . import dxf
+
+    with open(path, "rb") as f:
+        info["binary"] = f.read(len(dxf.BINARY_SENTINEL)) == dxf.BINARY_SENTINEL
+    layers = []
+    extents = {}
+    section = table = variable = None
+    pairs = dxf.tokens(path)
+    try:
+        for code, value in pairs:
+            if code == 0 and value == "SECTION":
+                _, section = next(pairs, (None, None))
+            elif code == 0 and value == "ENDSEC":
+                if section == "TABLES":
+                    break
+                section = None
+            elif section == "HEADER":
+                if code == 9:
+                    variable = value
+                elif variable == "$ACADVER" and code == 1:
+                    info["version"] = ACAD_VERSIONS.get(value, value)
+                elif variable == "$INSUNITS" and code == 70:
+                    info["units"] = INSUNITS.get(value, value)
+                elif variable in ("$EXTMIN", "$EXTMAX") and code in (10, 20, 30):
+                    extents.setdefault(variable, [0.0, 0.0, 0.0])[code // 10 - 1] = value
+            elif section == "TABLES":
+                if code == 0 and value == "TABLE":
+                    _, table = next(pairs, (None, None))
+                elif table == "LAYER" and code == 2:
+                    layers.append(value)
+            elif section in ("BLOCKS", "ENTITIES", "OBJECTS"):
+                break
+    finally:
+        pairs.close()
+    info["layers"] = layers
+    if "$EXTMIN" in extents and "$EXTMAX" in extents:
+        info["extents"] = [extents["$EXTMIN"], extents["$EXTMAX"]]
+
+
+def _probe_dgn(path, info):
+    with open(path, "rb") as f:
+        magic = f.read(8)
+    info["version"] = "V8" if magic == OLE_SIGNATURE else "V7"
+
+
+STEP_ENTRY = re.compile(r"\b(FILE_DESCRIPTION|FILE_NAME|FILE_SCHEMA)\s*\((.*?)\)\s*;", re.S)
+
+
+def _probe_step(path, info):
+    with open(path, "rb") as f:
+        header = f.read(STEP_HEADER_LIMIT).decode("latin-1")
+    header = header.split("DATA;", 1)[0]
+    entries = dict(STEP_ENTRY.findall(header))
+    schema = re.findall(r"'([^']*)'", entries.get("FILE_SCHEMA", ""))
+    info["version"] = schema[0] if schema else None
+    name = re.findall(r"'([^']*)'", entries.get("FILE_NAME", ""))
+    if name:
+        info["file_name"] = name[0]
+    if len(name) > 6:
+        info["originating_system"] = name[-2]
+
+
+def _probe_dwf(path, info):
+    with open(path, "rb") as f:
+        header = f.read(12).decode("ascii", "replace")
+    match = re.match(r"\(DWF V(\d+\.\d+)\)", header)
+    info["version"] = match.group(1) if match else None
+
+
+DWF_MANIFEST_NAMESPACE = re.compile(r"DWF-Manifest:(\d+\.\d+)")
+
+
+def _probe_dwfx(path, info):
+    # DWFX is an OPC zip package; its DWF manifest part carries the version.
+    with zipfile.ZipFile(path) as package:
+        manifests = [name for name in package.namelist() if name.lower().endswith("manifest.xml")]
+        if not manifests:
+            return
+        with package.open(manifests[0]) as f:
+            _, root = next(ElementTree.iterparse(f, events=("start",)))
+    match = DWF_MANIFEST_NAMESPACE.search(root.tag)
+    info["version"] = root.get("version") or (match.group(1) if match else None)
+
+
+def _probe_stl(path, info):
+    with open(path, "rb") as f:
+        header = f.read(84)
+    if len(header) == 84:
+        (count,) = struct.unpack("<I", header[80:84])
+        if 84 + count * 50 == info["size"]:
+            info["binary"] = True
+            info["triangles"] = count
+            return
+    info["binary"] = False
+
+
+def _probe_glb(path, info):
+    with open(path, "rb") as f:
+        header = f.read(20)
+        if len(header) < 20:
+            return
+        magic, version, _, chunk_length, chunk_type = struct.unpack("<4sIIII", header)
+        if magic != b"glTF" or chunk_type != 0x4E4F534A:
+            return
+        _probe_gltf_json(json.loads(f.read(chunk_length)), info)
+
+
+def _probe_gltf(path, info):
+    with open(path, encoding="utf-8") as f:
+        _probe_gltf_json(json.load(f), info)
+
+
+def _probe_gltf_json(document, info):
+    info["version"] = document.get("asset", {}).get("version")
+    info["meshes"] = len(document.get("meshes", []))
+    info["nodes"] = len(document.get("nodes", []))
+
+
+def _probe_fbx(path, info):
+    with open(path, "rb") as f:
+        header = f.read(27)
+    if len(header) == 27 and header.startswith(FBX_SIGNATURE):
+        (info["version"],) = struct.unpack("<I", header[23:27])
+        info["binary"] = True
+    else:
+        info["binary"] = False
+
+
+PROBES = {
+    "dgn": _probe_dgn,
+    "dwf": _probe_dwf,
+    "dwfx": _probe_dwfx,
+    "dwg": _probe_dwg,
+    "dwt": _probe_dwg,
+    "dxf": _probe_dxf,
+    "fbx": _probe_fbx,
+    "glb": _probe_glb,
+    "gltf": _probe_gltf,
+    "ifc": _probe_step,
+    "stl": _probe_stl,
+    "stp": _probe_step,
+}
+
+
+def probe(path, full=False):
+    """Return format, version and whatever header metadata ``path`` exposes cheaply.
+
+    Only file headers and, for DXF, the HEADER and TABLES sections are
+    read, so probing does not grow with the size of the drawing. Keys
+    that a format does not store up front are ``None``. With ``full``,
+    the drawing is loaded through aspose.cad to fill in the layers and
+    layouts the header could not provide.
+    """
+    fmt = format_of(path)
+    info = _info(path, fmt)
+    if fmt in PROBES:
+        PROBES[fmt](path, info)
+    if full and (info["layers"] is None or info["layouts"] is None):
+        from .engine import load
+
+        with load(path) as image:
+            layers = getattr(image, "layers", None)
+            if info["layers"] is None and layers is not None:
+                info["layers"] = list(layers.get_layers_names())
+            layouts = getattr(image, "layouts", None)
+            if info["layouts"] is None and layouts is not None:
+                info["layouts"] = list(layouts.keys())
+            info["width"] = image.width
+            info["height"] = image.height
+    return info
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="cadconvert.probe", description="Print drawing metadata as JSON lines.")
+    parser.add_argument("inputs", nargs="+", help="drawings to probe")
+    parser.add_argument("--full", action="store_true", help="load drawings to fill in what headers lack")
+    args = parser.parse_args(argv)
+    for path in args.inputs:
+        print(json.dumps(probe(path, args.full)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+import argparse
+import concurrent.futures
+import io
+import os
+import sys
+import tempfile
+import zipfile
+
+from .formats import normalize
+
+try:
+    from PIL import PngImagePlugin
+except ImportError:
+    PngImagePlugin = None
+
+TILE_FORMATS = {"png": "PNG", "webp": "WEBP"}
+
+
+def _encode(tile, fmt):
+    buffer = io.BytesIO()
+    tile.save(buffer, TILE_FORMATS[fmt])
+    return buffer.getvalue()
+
+
+def _levels(frame, max_zoom, min_zoom):
+    """Yield ``(z, image)`` from ``max_zoom`` down, halving the frame each level."""
+    level = frame
+    for z in range(max_zoom, min_zoom - 1, -1):
+        yield z, level
+        if z > min_zoom:
+            level = level.reduce(2)
+
+
+def build_pyramid(src, output, max_zoom, min_zoom=0, tile_size=256, fmt="png", raster_kwargs=None, workers=None):
+    """Render ``src`` once and write an XYZ tile pyramid to ``output``.
+
+    The drawing is rasterized a single time at the finest level
+    (``tile_size * 2 ** max_zoom`` pixels square). Coarser levels are
+    downsampled from the level below. Tiles are encoded on ``workers``
+    threads and written as ``z/x/y.<fmt>`` files under ``output``, or
+    into one zip archive when ``output`` ends in ``.zip``. Requires
+    Pillow.
+    """
+    if PngImagePlugin is None:
+        raise ImportError("build_pyramid requires Pillow: pip install Pillow")
+    from .engine import convert
+
+    fmt = normalize(fmt)
+    if fmt not in TILE_FORMATS:
+        raise ValueError("unsupported tile format: %r" % fmt)
+    side = tile_size << max_zoom
+    raster_kwargs = dict(raster_kwargs or {}, page_width=side, page_height=side)
+    archive = zipfile.ZipFile(output, "w", zipfile.ZIP_STORED) if output.endswith(".zip") else None
+    count = 0
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            frame_path = os.path.join(tmp, "frame.png")
+            convert(src, frame_path, raster_kwargs)
+            # The frame is our own render, so it is opened without Image.open()'s
+            # decompression-bomb guard; the process-wide limit is left alone.
+            with PngImagePlugin.PngImageFile(frame_path) as frame, concurrent.futures.ThreadPoolExecutor(workers) as pool:
+                if frame.size != (side, side):
+                    raise ValueError("expected a %dx%d render, got %dx%d" % ((side, side) + frame.size))
+                frame.load()
+                for z, level in _levels(frame, max_zoom, min_zoom):
+                    n = level.width // tile_size
+                    tiles = [(x, y) for x in range(n) for y in range(n)]
+
+                    def write(xy, level=level, z=z):
+                        x, y = xy
+                        box = (x * tile_size, y * tile_size, (x + 1) * tile_size, (y + 1) * tile_size)
+                        data = _encode(level.crop(box), fmt)
+                        name = "%d/%d/%d.%s" % (z, x, y, fmt)
+                        if archive is None:
+                            path = os.path.join(output, name)
+                            os.makedirs(os.path.dirname(path), exist_ok=True)
+                            with open(path, "wb") as f:
+                                f.write(data)
+                            return None
+                        return name, data
+
+                    for entry in pool.map(write, tiles):
+                        if entry is not None:
+                            archive.writestr(*entry)
+                    count += len(tiles)
+    finally:
+        if archive is not None:
+            archive.close()
+    return count
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="cadconvert.pyramid", description="Build an XYZ tile pyramid.")
+    parser.add_argument("input", help="drawing to render")
+    parser.add_argument("output", help="output directory, or a .zip archive")
+    parser.add_argument("--max-zoom", type=int, required=True)
+    parser.add_argument("--min-zoom", type=int, default=0)
+    parser.add_argument("--tile-size", type=int, default=256)
+    parser.add_argument("--format", default="png", choices=sorted(TILE_FORMATS))
+    parser.add_argument("-j", "--jobs", type=int, help="tile encoding threads")
+    parser.add_argument("--layer", dest="layers", action="append", help="layer to render, may be repeated")
+    parser.add_argument("--background", help="background color name, e.g. white")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    raster_kwargs = {"layers": args.layers, "background_color": args.background}
+    count = build_pyramid(args.input, args.output, args.max_zoom, args.min_zoom, args.tile_size, args.format,
+                          raster_kwargs, args.jobs)
+    print("%d tiles written to %s" % (count, args.output))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())